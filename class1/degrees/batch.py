@@ -0,0 +1,68 @@
+import csv
+import json
+import sys
+
+import degrees
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python batch.py directory queries.csv [processes]")
+    directory = sys.argv[1]
+    queries = sys.argv[2]
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    degrees.load_data(directory)
+    context, initializer, initargs = degrees.worker_context(directory)
+
+    with open(queries, encoding="utf-8") as f, \
+            context.Pool(processes, initializer, initargs) as pool:
+        pairs = (row for row in csv.reader(f) if len(row) >= 2)
+        for result in pool.imap(answer, pairs, chunksize=64):
+            print(json.dumps(result), flush=True)
+
+
+def answer(pair):
+    """
+    Resolves a (source, target) pair of names or person ids and
+    returns its shortest path as a JSON-serializable dictionary.
+    """
+    source, target = pair[0].strip(), pair[1].strip()
+    result = {"source": source, "target": target}
+
+    source_ids = resolve_person(source)
+    target_ids = resolve_person(target)
+    if not source_ids or not target_ids:
+        result["error"] = "Person not found."
+        return result
+    if len(source_ids) > 1 or len(target_ids) > 1:
+        result["error"] = "Ambiguous name."
+        if len(source_ids) > 1:
+            result["source_candidates"] = source_ids
+        if len(target_ids) > 1:
+            result["target_candidates"] = target_ids
+        return result
+
+    path = degrees.shortest_path(source_ids[0], target_ids[0], bidirectional=True)
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [list(step) for step in path]
+    return result
+
+
+def resolve_person(value):
+    """
+    Returns the sorted person_ids an id or name could refer to: none if
+    it is unknown, several if the name is ambiguous. Unlike
+    person_id_for_name this never prompts.
+    """
+    if value in degrees.people:
+        return [value]
+    return sorted(degrees.names.get(value.lower(), set()))
+
+
+if __name__ == "__main__":
+    main()
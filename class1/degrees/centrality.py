@@ -0,0 +1,186 @@
+import math
+import random
+import sys
+from array import array
+
+import degrees
+
+# Pivots that must reach a person before they are ranked by closeness
+MIN_REACHED = 8
+
+
+class Estimate():
+    """
+    Sampled centrality of every person, accumulated from full BFS runs
+    out of randomly chosen pivot people.
+
+    Closeness is harmonic: the mean over pivots of 1 / separation,
+    where unreachable pivots count 0, so people in small components
+    are not ranked above the giant component. Separation is the
+    average separation from the pivots that reach a person.
+    Betweenness is the fraction of shortest paths from a pivot that
+    pass through a person, following Brandes' dependency accumulation.
+    Errors are Hoeffding bounds that hold with probability 1 - delta
+    for each person.
+    """
+
+    def __init__(self, n, delta=0.05):
+        self.delta = delta
+        self.pivots = 0
+        self.diameter = 0
+        self.distance_sum = array("d", [0.0]) * n
+        self.harmonic_sum = array("d", [0.0]) * n
+        self.reached = array("i", [0]) * n
+        self.dependency_sum = array("d", [0.0]) * n
+
+    def add(self, distances, dependencies):
+        """
+        Adds the results of one pivot's BFS.
+        """
+        n = len(self.reached)
+        self.pivots += 1
+        for person in range(n):
+            if distances[person] > 0:
+                self.distance_sum[person] += distances[person]
+                self.harmonic_sum[person] += 1 / distances[person]
+                self.reached[person] += 1
+                if distances[person] > self.diameter:
+                    self.diameter = distances[person]
+        for person, dependency in dependencies.items():
+            self.dependency_sum[person] += dependency / max(1, n - 2)
+
+    def bound(self, samples):
+        return math.sqrt(math.log(2 / self.delta) / (2 * samples)) if samples else math.inf
+
+    def closeness(self, person):
+        """
+        Returns (harmonic closeness, error) for person.
+        """
+        return self.harmonic_sum[person] / self.pivots, self.bound(self.pivots)
+
+    def separation(self, person):
+        """
+        Returns (average separation, error) for person, or (None, None)
+        if no pivot reached them.
+        """
+        if self.reached[person] == 0:
+            return None, None
+        return (self.distance_sum[person] / self.reached[person],
+                self.diameter * self.bound(self.reached[person]))
+
+    def betweenness(self, person):
+        """
+        Returns (normalized betweenness, error) for person.
+        """
+        return self.dependency_sum[person] / self.pivots, self.bound(self.pivots)
+
+    def top(self, k=10, by="closeness", min_reached=MIN_REACHED):
+        """
+        Returns the k most central people, by largest harmonic
+        closeness among those reached by at least min_reached pivots,
+        or by largest betweenness.
+        """
+        if by == "closeness":
+            min_reached = min(min_reached, self.pivots)
+            people = [p for p in range(len(self.reached)) if self.reached[p] >= min_reached]
+            return sorted(people, key=lambda p: -self.harmonic_sum[p])[:k]
+        return sorted(range(len(self.reached)),
+                      key=lambda p: -self.dependency_sum[p])[:k]
+
+
+def estimate(samples=64, processes=None, seed=None, delta=0.05):
+    """
+    Runs BFS from samples random pivots over degrees.graph on a
+    process pool and returns the combined Estimate. Must be called
+    after degrees.load_data.
+    """
+    graph = degrees.graph
+    graph.compact()
+    n = graph.num_people()
+    pivots = random.Random(seed).sample(range(n), min(samples, n))
+
+    workers = degrees.worker_context()
+    if workers is None:
+        return combine(map(pivot_stats, pivots), n, delta)
+    context, initializer, initargs = workers
+    with context.Pool(processes, initializer, initargs) as pool:
+        results = pool.imap_unordered(pivot_stats, pivots)
+        return combine(results, n, delta)
+
+
+def combine(results, n, delta):
+    result = Estimate(n, delta)
+    for distances, dependencies in results:
+        result.add(distances, dependencies)
+    return result
+
+
+def pivot_stats(pivot):
+    """
+    Runs a BFS from pivot over the co-star graph. Returns the distance
+    to every person (-1 if unreachable) and each person's dependency:
+    the sum over targets of the fraction of shortest paths from pivot
+    that pass through them.
+    """
+    graph = degrees.graph
+    n = graph.num_people()
+    distances = array("i", [-1]) * n
+    paths = {pivot: 1}
+    predecessors = {}
+    distances[pivot] = 0
+
+    # Co-stars reached through several movies are counted once per parent
+    order = [pivot]
+    last_parent = {}
+    for person in order:
+        for movie in graph.movies_of(person):
+            for neighbor in graph.stars_of(movie):
+                if last_parent.get(neighbor) == person:
+                    continue
+                last_parent[neighbor] = person
+                if distances[neighbor] == -1:
+                    distances[neighbor] = distances[person] + 1
+                    paths[neighbor] = 0
+                    predecessors[neighbor] = []
+                    order.append(neighbor)
+                if distances[neighbor] == distances[person] + 1:
+                    paths[neighbor] += paths[person]
+                    predecessors[neighbor].append(person)
+
+    dependencies = dict.fromkeys(order, 0.0)
+    for person in reversed(order[1:]):
+        for predecessor in predecessors[person]:
+            dependencies[predecessor] += (
+                paths[predecessor] / paths[person] * (1 + dependencies[person])
+            )
+    del dependencies[pivot]
+    return distances, {p: d for p, d in dependencies.items() if d}
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python centrality.py directory [samples] [processes]")
+    samples = int(sys.argv[2]) if len(sys.argv) >= 3 else 64
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    print("Loading data...")
+    degrees.load_data(sys.argv[1])
+    print("Data loaded.")
+
+    result = estimate(samples, processes)
+    graph = degrees.graph
+    print(f"Most central by harmonic closeness ({result.pivots} pivots):")
+    for person in result.top(10, "closeness"):
+        value, error = result.closeness(person)
+        mean, _ = result.separation(person)
+        name = degrees.people[graph.person_ids[person]]["name"]
+        print(f"  {name}: {value:.3f} ± {error:.3f} (average separation {mean:.2f})")
+    print("Most central by betweenness:")
+    for person in result.top(10, "betweenness"):
+        value, error = result.betweenness(person)
+        name = degrees.people[graph.person_ids[person]]["name"]
+        print(f"  {name}: {value:.4f} ± {error:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from array import array
+
+
+class Components():
+    """
+    Union-find over the people of a graph, where everyone who starred
+    in the same movie is in the same connected component.
+    """
+
+    def __init__(self, graph):
+        self.parent = array("i", range(graph.num_people()))
+        self.size = array("i", [1]) * graph.num_people()
+        for movie in range(graph.num_movies()):
+            stars = graph.stars_of(movie)
+            for person in stars[1:]:
+                self.union(stars[0], person)
+
+    @classmethod
+    def restore(cls, parent, size):
+        """
+        Returns components saved as their parent and size arrays,
+        copied so they can still be updated.
+        """
+        components = cls.__new__(cls)
+        components.parent = array("i")
+        components.parent.frombytes(memoryview(parent).cast("B"))
+        components.size = array("i")
+        components.size.frombytes(memoryview(size).cast("B"))
+        return components
+
+    def find(self, person):
+        """
+        Returns the representative of person's component.
+        """
+        parent = self.parent
+        while parent[person] != person:
+            parent[person] = parent[parent[person]]
+            person = parent[person]
+        return person
+
+    def union(self, a, b):
+        """
+        Merges the components of a and b, by size.
+        """
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def add_person(self):
+        """
+        Adds a component for a person newly added to the graph.
+        """
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def size_of(self, person):
+        """
+        Returns the number of people in person's component.
+        """
+        return self.size[self.find(person)]
+
+    def sizes(self):
+        """
+        Returns the size of every component, largest first.
+        """
+        return sorted(
+            (self.size[person] for person in range(len(self.parent))
+             if self.parent[person] == person),
+            reverse=True
+        )
@@ -1,7 +1,17 @@
 import csv
+import datetime
+import multiprocessing
+import os
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import ingest
+import snapshot
+from components import Components
+from graph import Graph, parse_year
+from landmarks import Landmarks
+from nameindex import NameIndex
+from treecache import TreeCache
+from util import Node, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,46 +22,220 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and trigram index over names, built on first use by candidates_for_name
+name_index = None
 
-def load_data(directory):
+# Integer-id CSR index of the people/movies graph, compiled by load_data
+graph = None
+
+# Connected components of graph, kept up to date by load_data and apply_delta
+components = None
+
+# Landmark distance tables over graph, built by load_landmarks
+landmarks = None
+
+# LRU cache of BFS trees per source over graph, rebuilt by load_data
+tree_cache = None
+
+
+def load_data(directory, use_snapshot=True, fast=False):
     """
     Load data from CSV files into memory.
+
+    If use_snapshot is set, the data is read from the binary snapshot
+    next to the CSVs when it is up to date, and a new snapshot is
+    written after parsing the CSVs otherwise. names, people and movies
+    are then lazy tables over the snapshot, which decode entries as
+    they are looked up. If fast is set, the CSVs
+    are parsed by the lighter readers of ingest.load and its row
+    counts and throughput are printed.
+    """
+    global names, people, movies, graph, components, tree_cache, name_index
+
+    name_index = None
+    if use_snapshot:
+        data = snapshot.load(directory)
+        if data is not None:
+            names, people, movies, graph, components = data
+            tree_cache = TreeCache(graph)
+            return
+
+    if fast:
+        data = ingest.load(directory)
+        names.update(data[0])
+        people.update(data[1])
+        movies.update(data[2])
+        stats = data[3]
+        print(f"Parsed {stats['people']} people, {stats['movies']} movies and "
+              f"{stats['stars']} stars at {stats['rows_per_second']:.0f} rows/s.")
+    else:
+        # Load people
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                people[row["id"]] = {
+                    "name": row["name"],
+                    "birth": row["birth"],
+                    "movies": set()
+                }
+                if row["name"].lower() not in names:
+                    names[row["name"].lower()] = {row["id"]}
+                else:
+                    names[row["name"].lower()].add(row["id"])
+
+        # Load movies
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                movies[row["id"]] = {
+                    "title": row["title"],
+                    "year": row["year"],
+                    "stars": set()
+                }
+
+        # Load stars
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    people[row["person_id"]]["movies"].add(row["movie_id"])
+                    movies[row["movie_id"]]["stars"].add(row["person_id"])
+                except KeyError:
+                    pass
+
+    # Compile the graph used by the searches
+    graph = Graph.from_data(people, movies)
+    components = Components(graph)
+    tree_cache = TreeCache(graph)
+
+    if use_snapshot:
+        try:
+            snapshot.save(directory, people, movies, graph, components)
+        except OSError:
+            pass
+
+
+def apply_delta(directory):
+    """
+    Applies delta CSVs from directory to the loaded data, without
+    reloading it. people.csv, movies.csv and stars.csv add rows in the
+    usual format and removed_stars.csv removes star rows; each file is
+    optional. Cached BFS trees and landmark tables that the changes
+    could affect are dropped, and components are updated.
+    """
+    global components, landmarks
+
+    changed = set()
+    num_people = graph.num_people()
+
+    # New people
+    path = f"{directory}/people.csv"
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] in people:
+                    continue
+                people[row["id"]] = {
+                    "name": row["name"],
+                    "birth": row["birth"],
+                    "movies": set()
+                }
+                if row["name"].lower() not in names:
+                    names[row["name"].lower()] = {row["id"]}
+                    if name_index is not None:
+                        name_index.add(row["name"].lower())
+                else:
+                    names[row["name"].lower()].add(row["id"])
+                graph.add_person(row["id"])
+                components.add_person()
+
+    # New movies
+    path = f"{directory}/movies.csv"
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["id"] in movies:
+                    continue
+                movies[row["id"]] = {
+                    "title": row["title"],
+                    "year": row["year"],
+                    "stars": set()
+                }
+                graph.add_movie(row["id"], parse_year(row["year"]))
+
+    # Added and removed stars
+    removed = False
+    for filename, add in [("stars.csv", True), ("removed_stars.csv", False)]:
+        path = f"{directory}/{filename}"
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_id, movie_id = row["person_id"], row["movie_id"]
+                if person_id not in people or movie_id not in movies:
+                    continue
+                person = graph.person_index[person_id]
+                movie = graph.movie_index[movie_id]
+                changed.add(person)
+                changed.update(graph.stars_of(movie))
+                if add:
+                    people[person_id]["movies"].add(movie_id)
+                    movies[movie_id]["stars"].add(person_id)
+                    graph.add_star(person, movie)
+                    components.union(person, graph.stars_of(movie)[0])
+                else:
+                    people[person_id]["movies"].discard(movie_id)
+                    movies[movie_id]["stars"].discard(person_id)
+                    graph.remove_star(person, movie)
+                    removed = True
+
+    # Union-find cannot split components, so relabel after removals
+    if removed:
+        components = Components(graph)
+
+    # Drop derived results the changes could have made stale
+    tree_cache.invalidate(changed)
+    if changed or graph.num_people() != num_people:
+        landmarks = None
+
+
+def load_landmarks(directory, k=16):
+    """
+    Loads the landmark distance tables saved next to the CSVs in
+    directory, or builds them from k landmarks and saves them.
+    Must be called after load_data. Tables built after apply_delta
+    are not saved, since they no longer describe the CSVs.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+    global landmarks
+
+    landmarks = Landmarks.load(graph, directory)
+    if landmarks is None:
+        landmarks = Landmarks.build(graph, k)
+        if graph.revision == 0:
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
+                landmarks.save(directory)
+            except OSError:
                 pass
 
 
+def worker_context(directory=None):
+    """
+    Returns (context, initializer, initargs) for a multiprocessing pool
+    of workers that search the data loaded by load_data.
+
+    Workers forked after loading share the graph copy-on-write, so
+    they need no initializer. Where fork is unavailable they are
+    spawned and each loads the data from directory itself, normally
+    from the snapshot; without a directory None is returned and the
+    caller should do the work in this process.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork"), None, ()
+    if directory is None:
+        return None
+    return multiprocessing.get_context("spawn"), load_data, (directory,)
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -59,7 +243,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, fast=True)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +253,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -84,37 +268,150 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def connected(source, target):
+    """
+    Returns True if source and target are in the same component,
+    in near-constant time.
+    """
+    return components.connected(graph.person_index[source], graph.person_index[target])
+
+
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
     """
-    node = Node(state = source, movie = None, parent = None)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
+    return graph_path(breadth_first_search, source, target)
+
+
+def graph_path(search, source, target):
+    """
+    Runs search(source, target) over the graph indices of two connected
+    people and returns its path of (movie, person) indices as
+    (movie_id, person_id) pairs.
+
+    If no possible path, returns None.
+    """
+    if not connected(source, target):
+        return None
+    path = search(graph.person_index[source], graph.person_index[target])
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person]) for movie, person in path]
+
+
+def breadth_first_search(source, target):
+    """
+    Returns the shortest list of (movie, person) graph indices that
+    connect the source to the target, or None.
+    """
+    if source == target:
+        return []
+
+    # People are marked as seen when generated, so each is added to the
+    # frontier at most once and the goal is tested one layer earlier
     frontier = QueueFrontier()
-    frontier.add(node)
-    explored = set()
-    paths = list()
-    while True:
-        if frontier.empty():
-            return None
+    frontier.add(Node(state=source, movie=None, parent=None))
+    seen = {source}
+    while not frontier.empty():
         node = frontier.remove()
-        explored.add(node.state)
-        if node.state == target:
-            while node.parent!=None:
-                paths.append((node.movie, node.state))
-                node = node.parent
-            paths.reverse()
-            # paths = paths.reverse() is wrong as reverse() does not return anything, it just change the original list
-            return paths
-        
-        neighbors = neighbors_for_person(node.state)
-        for neighbor in neighbors:
-            if not neighbor[1] in explored and not frontier.contains_state(neighbor[1]):
-                child = Node(state = neighbor[1], movie = neighbor[0], parent = node)
-                # wrong: node = Node(state = neighbor[1], movie = neighbor[0], parent = node)
-                frontier.add(child)
+        for child in expand(node, seen):
+            if child.state == target:
+                paths = []
+                while child.parent is not None:
+                    paths.append((child.movie, child.state))
+                    child = child.parent
+                paths.reverse()
+                return paths
+            frontier.add(child)
+    return None
+
+
+def expand(node, seen):
+    """
+    Yields a child Node for each co-star of node's person who has not
+    been seen yet, movie by movie, marking each one as seen. States and
+    movies are graph indices.
+    """
+    for movie in graph.movies_of(node.state):
+        for person in graph.stars_of(movie):
+            if person not in seen:
+                seen.add(person)
+                yield Node(state=person, movie=movie, parent=node)
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Breadth-first search grown from both the source and the target
+    until the two frontiers meet, returning the same path format as
+    shortest_path.
+
+    If no possible path, returns None.
+    """
+    return graph_path(graph.bidirectional_search, source, target)
+
+
+def numpy_shortest_path(source, target):
+    """
+    Level-synchronous breadth-first search vectorized with NumPy,
+    returning the same path format as shortest_path.
+
+    If no possible path, returns None.
+    """
+    return graph_path(graph.numpy_search, source, target)
+
+
+def constrained_shortest_path(source, target, min_year=None, max_year=None,
+                              weight=None):
+    """
+    Returns the (movie_id, person_id) path from source to target using
+    only movies released between min_year and max_year. weight may be
+    "age" to prefer recent movies or "cast" to prefer movies with small
+    casts, in which case the cheapest rather than the shortest path is
+    returned.
+
+    If no possible path, returns None.
+    """
+    if weight == "age":
+        this_year = datetime.date.today().year
+        cost = lambda movie: 1 + max(0, this_year - (graph.movie_years[movie] or 1900))
+    elif weight == "cast":
+        cost = lambda movie: len(graph.stars_of(movie))
+    elif weight is None:
+        cost = None
+    else:
+        raise ValueError(f"unknown weight: {weight}")
+
+    def search(source, target):
+        return graph.constrained_search(source, target, min_year, max_year, cost)
+
+    return graph_path(search, source, target)
+
+
+def landmark_shortest_path(source, target):
+    """
+    Bidirectional A* search guided by the landmark distance tables,
+    returning the same path format as shortest_path. Requires
+    load_landmarks.
+
+    If no possible path, returns None.
+    """
+    return graph_path(landmarks.search, source, target)
+
+
+def cached_shortest_path(source, target):
+    """
+    Answers from the cached BFS tree of source, building and caching
+    the tree on a miss, returning the same path format as
+    shortest_path. See tree_cache.stats() for hit and miss counts.
+
+    If no possible path, returns None.
+    """
+    return graph_path(tree_cache.path, source, target)
 
 
 def person_id_for_name(name):
@@ -146,6 +443,18 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, limit=10):
+    """
+    Returns up to limit candidate IMDB ids for a partial or misspelled
+    name, prefix matches first and then the closest fuzzy matches.
+    """
+    global name_index
+
+    if name_index is None:
+        name_index = NameIndex(names)
+    return name_index.search(name, limit)
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -0,0 +1,430 @@
+import heapq
+from array import array
+
+
+class Graph():
+    """
+    Compressed sparse row (CSR) index of the co-star graph.
+
+    People and movies are given dense integer ids in load order. The
+    movies of person p are person_movies[person_offsets[p]:person_offsets[p + 1]]
+    and the stars of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+
+    Rows changed after the graph was compiled, and rows of people and
+    movies added since, are kept in person_rows and movie_rows and
+    take precedence over the CSR arrays.
+
+    movie_years holds each movie's release year, or 0 if unknown.
+    person_index and movie_index map IMDB ids back to integer ids, and
+    are built from person_ids and movie_ids unless given.
+
+    revision counts the changes made since the graph was compiled from
+    the CSVs, so results derived from the CSVs can tell they are stale.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 movie_years, person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        if person_index is None:
+            person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.movie_years = movie_years
+        self.person_rows = {}
+        self.movie_rows = {}
+        self.revision = 0
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Compiles the people and movies dictionaries filled in by
+        load_data into CSR arrays.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        person_offsets = array("i", [0])
+        person_movies = array("i")
+        for person_id in person_ids:
+            person_movies.extend(movie_index[m] for m in people[person_id]["movies"])
+            person_offsets.append(len(person_movies))
+
+        movie_offsets = array("i", [0])
+        movie_stars = array("i")
+        for movie_id in movie_ids:
+            movie_stars.extend(person_index[p] for p in movies[movie_id]["stars"])
+            movie_offsets.append(len(movie_stars))
+
+        movie_years = array("i", (parse_year(movies[m]["year"]) for m in movie_ids))
+
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_stars,
+                   movie_years)
+
+    def num_people(self):
+        return len(self.person_ids)
+
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """
+        Returns the integer ids of the movies person starred in.
+        """
+        row = self.person_rows.get(person)
+        if row is not None:
+            return row
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the integer ids of the people who starred in movie.
+        """
+        row = self.movie_rows.get(movie)
+        if row is not None:
+            return row
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def add_person(self, person_id):
+        """
+        Adds a person with no movies and returns their integer id.
+        """
+        person = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_index[person_id] = person
+        self.person_rows[person] = array("i")
+        self.revision += 1
+        return person
+
+    def add_movie(self, movie_id, year=0):
+        """
+        Adds a movie with no stars and returns its integer id.
+        """
+        movie = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        if not isinstance(self.movie_years, array):
+            self.movie_years = array("i", self.movie_years)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = movie
+        self.movie_rows[movie] = array("i")
+        self.revision += 1
+        return movie
+
+    def add_star(self, person, movie):
+        """
+        Records that person starred in movie.
+        """
+        person_row = self.editable_row(self.person_rows, self.movies_of, person)
+        movie_row = self.editable_row(self.movie_rows, self.stars_of, movie)
+        if movie not in person_row:
+            person_row.append(movie)
+            movie_row.append(person)
+            self.revision += 1
+
+    def remove_star(self, person, movie):
+        """
+        Removes the record that person starred in movie.
+        """
+        person_row = self.editable_row(self.person_rows, self.movies_of, person)
+        movie_row = self.editable_row(self.movie_rows, self.stars_of, movie)
+        if movie in person_row:
+            person_row.remove(movie)
+            movie_row.remove(person)
+            self.revision += 1
+
+    def editable_row(self, rows, lookup, i):
+        """
+        Returns the changed row for i, copying it out of the CSR arrays
+        the first time it is changed.
+        """
+        if i not in rows:
+            rows[i] = array("i", lookup(i))
+        return rows[i]
+
+    def bidirectional_search(self, source, target):
+        """
+        Breadth-first search grown from both source and target until
+        the two frontiers meet. Returns a list of (movie, person)
+        integer id pairs from source to target, or None if the two
+        people are not connected.
+        """
+        if source == target:
+            return []
+
+        # Each side maps a person to the person and movie of the step
+        # taken towards its own root; roots map to -1
+        forward_person = {source: -1}
+        forward_movie = {source: -1}
+        backward_person = {target: -1}
+        backward_movie = {target: -1}
+        forward_layer = [source]
+        backward_layer = [target]
+
+        while forward_layer and backward_layer:
+
+            # Always grow the smaller frontier by one full layer
+            if len(forward_layer) <= len(backward_layer):
+                forward_layer, meeting = self.expand_layer(
+                    forward_layer, forward_person, forward_movie, backward_person
+                )
+            else:
+                backward_layer, meeting = self.expand_layer(
+                    backward_layer, backward_person, backward_movie, forward_person
+                )
+
+            if meeting != -1:
+                return self.join_paths(
+                    meeting, forward_person, forward_movie, backward_person, backward_movie
+                )
+
+        return None
+
+    def expand_layer(self, layer, parent_person, parent_movie, other):
+        """
+        Expands every person in layer by one step, recording parents.
+        Returns the next layer and the person where this side met the
+        other side, preferring the meeting closest to the other side's
+        root, or -1 if the sides have not met.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+
+        next_layer = []
+        meeting = -1
+        best = -1
+        for person in layer:
+            for movie in movies_of(person):
+                for neighbor in stars_of(movie):
+                    if neighbor in parent_person:
+                        continue
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    next_layer.append(neighbor)
+                    if neighbor in other:
+                        distance = self.depth(neighbor, other)
+                        if best == -1 or distance < best:
+                            meeting, best = neighbor, distance
+        return next_layer, meeting
+
+    def depth(self, person, parent_person):
+        """
+        Returns the number of steps from person back to the root of
+        a search side.
+        """
+        length = 0
+        while parent_person[person] != -1:
+            person = parent_person[person]
+            length += 1
+        return length
+
+    def join_paths(self, meeting, forward_person, forward_movie,
+                   backward_person, backward_movie):
+        """
+        Builds the (movie, person) path from the source to the target
+        through the person where both searches met.
+        """
+        path = []
+        person = meeting
+        while forward_person[person] != -1:
+            path.append((forward_movie[person], person))
+            person = forward_person[person]
+        path.reverse()
+
+        person = meeting
+        while backward_person[person] != -1:
+            path.append((backward_movie[person], backward_person[person]))
+            person = backward_person[person]
+        return path
+
+    def bfs_tree(self, source):
+        """
+        Runs a full breadth-first search from source. Returns two
+        arrays indexed by person: the parent person and the movie
+        linking them. The source is its own parent and people in other
+        components have parent -1.
+        """
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        parent_person[source] = source
+        layer = [source]
+        while layer:
+            next_layer = []
+            for person in layer:
+                for movie in self.movies_of(person):
+                    for neighbor in self.stars_of(movie):
+                        if parent_person[neighbor] == -1:
+                            parent_person[neighbor] = person
+                            parent_movie[neighbor] = movie
+                            next_layer.append(neighbor)
+            layer = next_layer
+        return parent_person, parent_movie
+
+    def constrained_search(self, source, target, min_year=None, max_year=None,
+                           weight=None):
+        """
+        Search that only follows movies released between min_year and
+        max_year inclusive; movies with an unknown year are skipped when
+        either bound is given. Without weight this is a breadth-first
+        search; otherwise weight(movie) gives the non-negative cost of
+        each step and Dijkstra's algorithm finds the cheapest path.
+        Returns a list of (movie, person) integer id pairs, or None.
+        """
+        if source == target:
+            return []
+
+        movie_years = self.movie_years
+        bounded = min_year is not None or max_year is not None
+        low = min_year if min_year is not None else 0
+        high = max_year if max_year is not None else 1 << 30
+
+        parent_person = {source: -1}
+        parent_movie = {source: -1}
+        cost = {source: 0}
+        explored = set()
+        frontier = [(0, 0, source)]
+        counter = 0
+
+        while frontier:
+            g, _, person = heapq.heappop(frontier)
+            if person in explored:
+                continue
+            if person == target:
+                path = []
+                while parent_person[person] != -1:
+                    path.append((parent_movie[person], person))
+                    person = parent_person[person]
+                path.reverse()
+                return path
+            explored.add(person)
+
+            for movie in self.movies_of(person):
+                if bounded and not (movie_years[movie] and low <= movie_years[movie] <= high):
+                    continue
+                step = 1 if weight is None else weight(movie)
+                for neighbor in self.stars_of(movie):
+                    if neighbor in explored:
+                        continue
+                    if neighbor in cost and cost[neighbor] <= g + step:
+                        continue
+                    cost[neighbor] = g + step
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    counter += 1
+                    heapq.heappush(frontier, (g + step, counter, neighbor))
+
+        return None
+
+    def compact(self):
+        """
+        Folds the changed and added rows back into the CSR arrays.
+        """
+        if not self.person_rows and not self.movie_rows:
+            return
+
+        person_offsets = array("i", [0])
+        person_movies = array("i")
+        for person in range(len(self.person_ids)):
+            person_movies.extend(self.movies_of(person))
+            person_offsets.append(len(person_movies))
+
+        movie_offsets = array("i", [0])
+        movie_stars = array("i")
+        for movie in range(len(self.movie_ids)):
+            movie_stars.extend(self.stars_of(movie))
+            movie_offsets.append(len(movie_stars))
+
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.person_rows = {}
+        self.movie_rows = {}
+
+    def numpy_search(self, source, target):
+        """
+        Level-synchronous breadth-first search that expands a whole
+        layer at a time with NumPy index arithmetic over the CSR
+        arrays. Returns a list of (movie, person) integer id pairs
+        from source to target, or None if they are not connected.
+        """
+        import numpy as np
+
+        if source == target:
+            return []
+        self.compact()
+
+        person_offsets = np.frombuffer(self.person_offsets, dtype=np.int32)
+        person_movies = np.frombuffer(self.person_movies, dtype=np.int32)
+        movie_offsets = np.frombuffer(self.movie_offsets, dtype=np.int32)
+        movie_stars = np.frombuffer(self.movie_stars, dtype=np.int32)
+
+        visited = np.zeros(len(self.person_ids), dtype=bool)
+        expanded = np.zeros(len(self.movie_ids), dtype=bool)
+        parent_person = np.full(len(self.person_ids), -1, dtype=np.int32)
+        parent_movie = np.full(len(self.person_ids), -1, dtype=np.int32)
+        visited[source] = True
+        layer = np.array([source], dtype=np.int32)
+
+        while layer.size:
+
+            # Movies of every person in the layer, each expanded only once
+            movies, via_person = gather(np, person_offsets, person_movies, layer)
+            movies, first = np.unique(movies, return_index=True)
+            via_person = via_person[first]
+            fresh = ~expanded[movies]
+            movies, via_person = movies[fresh], via_person[fresh]
+            expanded[movies] = True
+
+            # Stars of those movies not visited yet become the next layer
+            stars, via_movie = gather(np, movie_offsets, movie_stars, movies)
+            via_person = np.repeat(via_person, movie_offsets[movies + 1] - movie_offsets[movies])
+            fresh = ~visited[stars]
+            stars, via_movie, via_person = stars[fresh], via_movie[fresh], via_person[fresh]
+            stars, first = np.unique(stars, return_index=True)
+            visited[stars] = True
+            parent_person[stars] = via_person[first]
+            parent_movie[stars] = via_movie[first]
+
+            if visited[target]:
+                path = []
+                person = target
+                while person != source:
+                    path.append((int(parent_movie[person]), int(person)))
+                    person = parent_person[person]
+                path.reverse()
+                return path
+            layer = stars
+
+        return None
+
+
+def parse_year(year):
+    """
+    Returns year as an integer, or 0 if it is missing or malformed.
+    """
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return 0
+
+
+def gather(np, offsets, targets, rows):
+    """
+    Concatenates the CSR rows of the given ids without a Python loop.
+    Returns the row entries and, for each entry, the id it came from.
+    """
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    ends = np.cumsum(counts)
+    positions = np.arange(ends[-1] if counts.size else 0) + np.repeat(starts - ends + counts, counts)
+    return targets[positions], np.repeat(rows, counts)
@@ -0,0 +1,293 @@
+import heapq
+import json
+import mmap
+import operator
+import os
+import struct
+from array import array
+
+import snapshot
+
+# Landmark (ALT) distance tables for A* over the co-star graph.
+#
+# Saved next to the CSVs as MAGIC, an 8-byte header length, a JSON
+# header and the int16 distance table, laid out person by person so
+# the K distances of one person are contiguous.
+FILENAME = "degrees.landmarks"
+MAGIC = b"DEGLMRK2"
+
+# Distance recorded for people a landmark cannot reach
+UNREACHABLE = -1
+
+# Landmarks used by each search, those with the best bound between its ends
+ACTIVE = 4
+
+
+class Landmarks():
+    """
+    Exact BFS distances from K landmark people to every person. By
+    the triangle inequality, |d(L, t) - d(L, v)| is a lower bound on
+    d(v, t) for every landmark L, which makes an admissible and
+    consistent A* heuristic.
+    """
+
+    def __init__(self, graph, people, distances):
+        self.graph = graph
+        self.people = people
+        self.distances = distances
+
+    def row(self, person):
+        """
+        Returns the distances from each landmark to person.
+        """
+        k = len(self.people)
+        return self.distances[person * k:(person + 1) * k]
+
+    @classmethod
+    def build(cls, graph, k=16):
+        """
+        Picks the k people with the most co-stars as landmarks and
+        runs a full BFS from each of them.
+        """
+        degree = [
+            sum(len(graph.stars_of(movie)) - 1 for movie in graph.movies_of(person))
+            for person in range(graph.num_people())
+        ]
+        people = sorted(range(graph.num_people()), key=lambda p: -degree[p])[:k]
+
+        distances = array("h", [UNREACHABLE]) * (len(people) * graph.num_people())
+        for i, landmark in enumerate(people):
+            distances[i::len(people)] = bfs_distances(graph, landmark)
+        return cls(graph, people, distances)
+
+    def save(self, directory):
+        """
+        Writes the distance tables next to the CSVs in directory.
+        """
+        header = json.dumps({
+            "sources": snapshot.source_stamps(directory),
+            "people": [self.graph.person_ids[p] for p in self.people]
+        }).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+        path = os.path.join(directory, FILENAME)
+        with open(path + ".tmp", "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(self.distances.tobytes())
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, graph, directory):
+        """
+        Returns the distance tables saved in directory, memory-mapped,
+        or None if they are missing, cannot be read, the CSVs have
+        changed, or a delta has changed graph since it was compiled
+        from the CSVs.
+        """
+        if graph.revision != 0:
+            return None
+
+        path = os.path.join(directory, FILENAME)
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        # Like the snapshot, the tables are only a cache, so a truncated
+        # or corrupt file is treated like a missing one and rebuilt
+        try:
+            return cls.read(graph, buffer, directory)
+        except (ValueError, TypeError, KeyError, struct.error):
+            return None
+
+    @classmethod
+    def read(cls, graph, buffer, directory):
+        """
+        Decodes the tables in buffer, returning None if they are stale.
+        """
+        if buffer[:len(MAGIC)] != MAGIC:
+            return None
+        (length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(buffer[start:start + length])
+        try:
+            if header["sources"] != snapshot.source_stamps(directory):
+                return None
+        except OSError:
+            return None
+
+        people = [graph.person_index[person_id] for person_id in header["people"]]
+        distances = memoryview(buffer)[start + length:].cast("h")
+        if len(distances) != len(people) * graph.num_people():
+            return None
+        return cls(graph, people, distances)
+
+    def lower_bound(self, person, target):
+        """
+        Returns a lower bound on the separation between person and
+        target, or None if some landmark proves they are not connected.
+        """
+        best = 0
+        for to_person, to_target in zip(self.row(person), self.row(target)):
+            if (to_person == UNREACHABLE) != (to_target == UNREACHABLE):
+                return None
+            if abs(to_target - to_person) > best:
+                best = abs(to_target - to_person)
+        return best
+
+    def search(self, source, target):
+        """
+        Bidirectional A* search between source and target guided by
+        the landmark bounds. Returns a list of (movie, person) integer
+        id pairs from source to target, or None if the two people are
+        not connected.
+        """
+        if self.lower_bound(source, target) is None:
+            return None
+        if source == target:
+            return []
+
+        # Bounds come from the ACTIVE landmarks that best separate source
+        # and target, computed once per person as (towards target,
+        # towards source)
+        source_row = self.row(source)
+        target_row = self.row(target)
+        active = sorted(
+            range(len(self.people)),
+            key=lambda i: -abs(target_row[i] - source_row[i])
+        )[:ACTIVE]
+        source_row = [source_row[i] for i in active]
+        target_row = [target_row[i] for i in active]
+        k = len(self.people)
+        distances = self.distances
+        sub = operator.sub
+        bounds = {}
+
+        def bound(person):
+            value = bounds.get(person)
+            if value is None:
+                row = [distances[person * k + i] for i in active]
+                value = bounds[person] = (
+                    max(map(abs, map(sub, row, target_row)), default=0),
+                    max(map(abs, map(sub, row, source_row)), default=0)
+                )
+            return value
+
+        # Both sides key people by 2 * separation plus the difference of
+        # the two bounds (negated going backwards), the doubled average
+        # potential, so they agree on reduced costs and can stop once
+        # their smallest keys sum to twice the best path found
+        forward = Side(source, 1, bound(source))
+        backward = Side(target, -1, bound(target))
+        best = None
+        meeting = -1
+
+        while forward.frontier and backward.frontier:
+            if best is not None and (
+                forward.frontier[0][0] + backward.frontier[0][0] >= 2 * best
+            ):
+                break
+
+            # Grow the side with the smaller key by one person
+            if forward.frontier[0][0] <= backward.frontier[0][0]:
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+            person = side.pop()
+            if person is None:
+                continue
+
+            g = side.cost[person] + 1
+            for movie in self.graph.movies_of(person):
+                for neighbor in self.graph.stars_of(movie):
+                    if neighbor in side.settled:
+                        continue
+                    if neighbor in side.cost and side.cost[neighbor] <= g:
+                        continue
+
+                    # Skip people that cannot be on a path shorter than best
+                    to_target, to_source = bound(neighbor)
+                    ahead = to_target if side is forward else to_source
+
+                    side.cost[neighbor] = g
+                    side.parent_person[neighbor] = person
+                    side.parent_movie[neighbor] = movie
+                    heapq.heappush(
+                        side.frontier,
+                        (2 * g + side.sign * (to_target - to_source), neighbor)
+                    )
+                    if neighbor in other.cost and (
+                        best is None or g + other.cost[neighbor] < best
+                    ):
+                        best = g + other.cost[neighbor]
+                        meeting = neighbor
+
+        if best is None:
+            return None
+
+        # Walk from the meeting person back to source, then on to target
+        path = []
+        person = meeting
+        while person != source:
+            path.append((forward.parent_movie[person], person))
+            person = forward.parent_person[person]
+        path.reverse()
+        person = meeting
+        while person != target:
+            path.append((backward.parent_movie[person], backward.parent_person[person]))
+            person = backward.parent_person[person]
+        return path
+
+
+class Side():
+    """
+    One direction of the bidirectional landmark search: separations
+    from its root, parents towards its root, settled people and the
+    frontier heap of (key, person). sign is 1 searching from source and
+    -1 searching from target, and bounds is the root's (towards target,
+    towards source) bound pair.
+    """
+
+    def __init__(self, root, sign, bounds):
+        self.sign = sign
+        self.cost = {root: 0}
+        self.parent_person = {root: -1}
+        self.parent_movie = {root: -1}
+        self.settled = set()
+        self.frontier = [(sign * (bounds[0] - bounds[1]), root)]
+
+    def pop(self):
+        """
+        Settles and returns the person with the smallest key, or None
+        if the entry popped was for a person already settled.
+        """
+        _, person = heapq.heappop(self.frontier)
+        if person in self.settled:
+            return None
+        self.settled.add(person)
+        return person
+
+
+def bfs_distances(graph, source):
+    """
+    Returns an array of the separation from source to every person,
+    with UNREACHABLE for people in other components.
+    """
+    distances = array("h", [UNREACHABLE]) * graph.num_people()
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_of(person):
+                for neighbor in graph.stars_of(movie):
+                    if distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = depth
+                        next_layer.append(neighbor)
+        layer = next_layer
+    return distances
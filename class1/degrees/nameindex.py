@@ -0,0 +1,136 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+# Fraction of the query's trigrams a name must share to be a fuzzy match
+MIN_SHARED = 0.5
+
+
+class NameIndex():
+    """
+    Lookup index over the lower-cased names dictionary: a sorted key
+    list for prefix (autocomplete) search, and a trigram index for
+    typo-tolerant search.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.keys = []
+        self.sizes = array("i")
+        self.grams = {}
+        for key in names:
+            self.index(key)
+        self.order = sorted(self.keys)
+
+    def add(self, key):
+        """
+        Indexes a name newly added to the names dictionary.
+        """
+        self.index(key)
+        insort(self.order, key)
+
+    def index(self, key):
+        """
+        Appends key to keys, recording its trigrams against its position.
+        """
+        i = len(self.keys)
+        self.keys.append(key)
+        key_grams = trigrams(key)
+        self.sizes.append(len(key_grams))
+        for gram in key_grams:
+            if gram not in self.grams:
+                self.grams[gram] = array("i")
+            self.grams[gram].append(i)
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to limit person_ids whose name starts with prefix,
+        in alphabetical order of name.
+        """
+        prefix = prefix.lower()
+        keys = self.order
+        matches = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(matches) < limit:
+            matches.append(keys[i])
+            i += 1
+        return self.person_ids(matches, limit)
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to limit person_ids whose names share at least
+        MIN_SHARED of the trigrams of name, ranked by Dice similarity.
+        """
+        query = trigrams(name.lower())
+        if not query:
+            return []
+        postings = sorted(
+            (self.grams.get(gram, ()) for gram in query), key=len
+        )
+        needed = max(1, math.ceil(MIN_SHARED * len(query)))
+
+        # A name sharing needed grams is in one of the len(query) - needed + 1
+        # rarest posting lists, so only those are scanned for candidates
+        probe = len(query) - needed + 1
+        shared = Counter()
+        for posting in postings[:probe]:
+            shared.update(posting)
+
+        # Count the grams each candidate shares with name, best partial
+        # matches first, skipping those that cannot beat the limit-th best
+        sizes = self.sizes
+        unscanned = len(query) - probe
+        best = []
+        for i, count in sorted(shared.items(), key=lambda item: (-item[1], item[0])):
+            size = sizes[i]
+            most = min(count + unscanned, size)
+            if most < needed:
+                continue
+            if len(best) == limit and 2 * most / (len(query) + size) <= best[0][0]:
+                continue
+            count = len(query & trigrams(self.keys[i]))
+            if count < needed:
+                continue
+            score = 2 * count / (len(query) + size)
+            if len(best) < limit:
+                heapq.heappush(best, (score, -i))
+            elif score > best[0][0]:
+                heapq.heapreplace(best, (score, -i))
+
+        best.sort(reverse=True)
+        return self.person_ids([self.keys[-i] for _, i in best], limit)
+
+    def search(self, name, limit=10):
+        """
+        Returns up to limit candidate person_ids for name: prefix
+        matches first, then fuzzy matches.
+        """
+        candidates = self.complete(name, limit)
+        if len(candidates) < limit:
+            for person_id in self.fuzzy(name, limit):
+                if person_id not in candidates:
+                    candidates.append(person_id)
+        return candidates[:limit]
+
+    def person_ids(self, keys, limit):
+        """
+        Expands matched names into at most limit person_ids.
+        """
+        result = []
+        for key in keys:
+            for person_id in sorted(self.names[key]):
+                if len(result) == limit:
+                    return result
+                result.append(person_id)
+        return result
+
+
+def trigrams(name):
+    """
+    Returns the set of padded three-letter substrings of name.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if name else set()
+
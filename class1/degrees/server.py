@@ -0,0 +1,105 @@
+import asyncio
+import concurrent.futures
+import json
+import sys
+
+import batch
+import degrees
+
+# Requests and responses are JSON objects, one per line:
+#   {"op": "shortest_path", "source": "Kevin Bacon", "target": "102"}
+#   {"op": "person_id_for_name", "name": "Tom Hanks"}
+# Searches run on a process pool; name lookups are answered inline.
+
+# String fields each op requires
+FIELDS = {
+    "shortest_path": ["source", "target"],
+    "person_id_for_name": ["name"]
+}
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python server.py directory [host:port | socket path]")
+    directory = sys.argv[1]
+    address = sys.argv[2] if len(sys.argv) == 3 else "127.0.0.1:8765"
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    context, initializer, initargs = degrees.worker_context(directory)
+    pool = concurrent.futures.ProcessPoolExecutor(
+        mp_context=context, initializer=initializer, initargs=initargs
+    )
+
+    with pool:
+        asyncio.run(serve(address, pool))
+
+
+async def serve(address, pool):
+    """
+    Accepts connections on a TCP host:port or a Unix socket path
+    until interrupted.
+    """
+    async def handle(reader, writer):
+        await handle_connection(reader, writer, pool)
+
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+        server = await asyncio.start_server(handle, host, int(port))
+    else:
+        server = await asyncio.start_unix_server(handle, address)
+    print(f"Listening on {address}")
+    async with server:
+        await server.serve_forever()
+
+
+async def handle_connection(reader, writer, pool):
+    """
+    Answers JSON requests from one client until it disconnects.
+    """
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                response = await respond(json.loads(line), pool)
+            except (ValueError, KeyError, TypeError):
+                response = {"error": "Invalid request."}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def respond(request, pool):
+    """
+    Returns the response to a single request. Raises ValueError,
+    KeyError or TypeError for a malformed one.
+    """
+    if not isinstance(request, dict):
+        raise TypeError("request is not an object")
+    if request["op"] not in FIELDS:
+        return {"error": f"Unknown op: {request['op']}"}
+    for field in FIELDS[request["op"]]:
+        if not isinstance(request[field], str):
+            raise TypeError(f"{field} is not a string")
+
+    if request["op"] == "shortest_path":
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            pool, batch.answer, (request["source"], request["target"])
+        )
+    elif request["op"] == "person_id_for_name":
+        name = request["name"]
+        return {
+            "name": name,
+            "person_ids": sorted(degrees.names.get(name.lower(), set())),
+            "candidates": degrees.candidates_for_name(name)
+        }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+
+from components import Components
+from graph import Graph
+from tables import IdIndex, NameTable, Records, StringTable
+
+# Binary snapshot of the loaded degrees data, stored next to the CSVs.
+#
+# Layout: MAGIC, an 8-byte little-endian header length, a JSON header
+# describing the source CSVs and the sections, then the sections
+# themselves, all read through a memory map instead of being copied:
+# the int32 arrays of the graph (CSR rows and movie years), sorted
+# orders of the ids and lower-cased names for binary search, the
+# component labels, and each column of strings as a UTF-8 blob with
+# int64 offsets. The header holds a CRC-32 of the sections, which are
+# otherwise only decoded lazily, long after loading.
+FILENAME = "degrees.snapshot"
+MAGIC = b"DEGSNAP3"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+ARRAYS = [
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars", "movie_years"
+]
+STRINGS = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_year_text"
+]
+
+
+def source_stamps(directory):
+    """
+    Returns the size and modification time of each source CSV, used
+    to detect a stale snapshot.
+    """
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def save(directory, people, movies, graph, components):
+    """
+    Writes a snapshot of the loaded data to directory.
+    """
+    person_ids = list(graph.person_ids)
+    movie_ids = list(graph.movie_ids)
+    person_names = [people[person_id]["name"] for person_id in person_ids]
+    columns = {
+        "person_ids": person_ids,
+        "person_names": person_names,
+        "person_births": [people[person_id]["birth"] for person_id in person_ids],
+        "movie_ids": movie_ids,
+        "movie_titles": [movies[movie_id]["title"] for movie_id in movie_ids],
+        "movie_year_text": [movies[movie_id]["year"] for movie_id in movie_ids]
+    }
+
+    sections = []
+    for name in ARRAYS:
+        sections.append((name, getattr(graph, name).tobytes()))
+    orders = {
+        "person_order": sorted(range(len(person_ids)), key=person_ids.__getitem__),
+        "movie_order": sorted(range(len(movie_ids)), key=movie_ids.__getitem__),
+        "name_order": sorted(range(len(person_ids)), key=lambda p: person_names[p].lower()),
+        "component_parent": map(components.find, range(len(person_ids))),
+        "component_size": components.size
+    }
+    for name, values in orders.items():
+        sections.append((name, array("i", values).tobytes()))
+    for name in STRINGS:
+        blob, offsets = StringTable.pack(columns[name])
+        sections.append((name + "_blob", blob))
+        sections.append((name + "_offsets", offsets.tobytes()))
+
+    # Offsets are relative to the end of the header, with every
+    # section aligned to 8 bytes so the arrays can be cast in place
+    layout = {}
+    offset = 0
+    checksum = 0
+    for name, data in sections:
+        layout[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+        checksum = zlib.crc32(data, checksum)
+        checksum = zlib.crc32(b"\0" * (-len(data) % 8), checksum)
+    header = json.dumps({
+        "sources": source_stamps(directory),
+        "sections": layout,
+        "checksum": checksum
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    path = os.path.join(directory, FILENAME)
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(path + ".tmp", path)
+
+
+def load(directory):
+    """
+    Returns (names, people, movies, graph, components) from the
+    snapshot in directory, or None if there is no snapshot, it cannot
+    be read, or the source CSVs have changed since it was written.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # The snapshot is only a cache, so a truncated or corrupt file is
+    # treated like a missing one and the CSVs are parsed instead
+    try:
+        return read(buffer, directory)
+    except (ValueError, TypeError, KeyError, IndexError, struct.error):
+        return None
+
+
+def read(buffer, directory):
+    """
+    Decodes the snapshot in buffer, returning None if it is stale.
+    Names, people and movies are the lazy tables of the tables module.
+    """
+    if buffer[:len(MAGIC)] != MAGIC:
+        return None
+    (length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+    start = len(MAGIC) + 8
+    header = json.loads(buffer[start:start + length])
+    try:
+        if header["sources"] != source_stamps(directory):
+            return None
+    except OSError:
+        return None
+
+    start += length
+    view = memoryview(buffer)
+    layout = header["sections"]
+    if zlib.crc32(view[start:]) != header["checksum"]:
+        raise ValueError("snapshot checksum does not match")
+
+    def section(name, format="B", count=None):
+        offset, size = layout[name]
+        if start + offset + size > len(buffer):
+            raise ValueError(f"snapshot section {name} is truncated")
+        values = view[start + offset:start + offset + size].cast(format)
+        if count is not None and len(values) != count:
+            raise ValueError(f"snapshot section {name} has the wrong length")
+        return values
+
+    def strings(name, count):
+        table = StringTable(section(name + "_blob"), section(name + "_offsets", "q"))
+        if len(table) != count or table.offsets[-1] != len(table.blob):
+            raise ValueError(f"snapshot column {name} is inconsistent")
+        return table
+
+    arrays = [section(name, "i") for name in ARRAYS]
+    num_people = len(arrays[0]) - 1
+    num_movies = len(arrays[2]) - 1
+    person_ids = strings("person_ids", num_people)
+    person_names = strings("person_names", num_people)
+    person_births = strings("person_births", num_people)
+    movie_ids = strings("movie_ids", num_movies)
+    movie_titles = strings("movie_titles", num_movies)
+    movie_years = strings("movie_year_text", num_movies)
+    person_index = IdIndex(person_ids, section("person_order", "i", num_people))
+    movie_index = IdIndex(movie_ids, section("movie_order", "i", num_movies))
+    graph = Graph(person_ids, movie_ids, *arrays,
+                  person_index=person_index, movie_index=movie_index)
+
+    people = Records(person_index, lambda person: {
+        "name": person_names[person],
+        "birth": person_births[person],
+        "movies": {movie_ids[movie] for movie in graph.movies_of(person)}
+    })
+    movies = Records(movie_index, lambda movie: {
+        "title": movie_titles[movie],
+        "year": movie_years[movie],
+        "stars": {person_ids[person] for person in graph.stars_of(movie)}
+    })
+    names = NameTable(person_names, person_ids, section("name_order", "i", num_people))
+    components = Components.restore(
+        section("component_parent", "i", num_people),
+        section("component_size", "i", num_people)
+    )
+    return names, people, movies, graph, components
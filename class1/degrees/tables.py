@@ -0,0 +1,178 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+
+# Read-only views over the flat sections of a snapshot, standing in for
+# the lists and dictionaries load_data builds from the CSVs. Nothing is
+# decoded until it is looked up, and rows added or changed afterwards,
+# by apply_delta, are kept in ordinary lists and dictionaries on top.
+
+
+class StringTable():
+    """
+    List of strings stored as one UTF-8 blob and an offsets array,
+    where string i is blob[offsets[i]:offsets[i + 1]]. Strings appended
+    later are kept in a plain list after the stored ones.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self.stored = len(offsets) - 1
+        self.added = []
+
+    @staticmethod
+    def pack(strings):
+        """
+        Returns the (blob, offsets) encoding of strings.
+        """
+        blob = bytearray()
+        offsets = array("q", [0])
+        for string in strings:
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+        return bytes(blob), offsets
+
+    def __len__(self):
+        return self.stored + len(self.added)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i >= self.stored:
+            return self.added[i - self.stored]
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, string):
+        self.added.append(string)
+
+
+class IdIndex(MutableMapping):
+    """
+    Maps the strings of a StringTable to their positions, by binary
+    search over order, the stored positions sorted by string. Strings
+    added later are mapped by a dictionary.
+    """
+
+    def __init__(self, strings, order):
+        self.strings = strings
+        self.order = order
+        self.added = {}
+
+    def __getitem__(self, key):
+        if key in self.added:
+            return self.added[key]
+        order = self.order
+        i = bisect_left(order, key, key=self.strings.__getitem__)
+        if i < len(order) and self.strings[order[i]] == key:
+            return order[i]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.added[key] = value
+
+    def __delitem__(self, key):
+        raise TypeError("ids cannot be removed")
+
+    def __iter__(self):
+        yield from self.strings
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class Records(MutableMapping):
+    """
+    The people or movies dictionary of load_data, keyed by IMDB id.
+    Each record is built by build(i) from the snapshot the first time
+    its id is looked up, then kept, so changes made to it stick.
+    """
+
+    def __init__(self, index, build):
+        self.index = index
+        self.build = build
+        self.records = {}
+
+    def __getitem__(self, key):
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = self.build(self.index[key])
+        return record
+
+    def __setitem__(self, key, record):
+        self.records[key] = record
+
+    def __delitem__(self, key):
+        raise TypeError("records cannot be removed")
+
+    def __contains__(self, key):
+        return key in self.records or key in self.index
+
+    def __iter__(self):
+        yield from self.index
+
+    def __len__(self):
+        return len(self.index)
+
+
+class NameTable(MutableMapping):
+    """
+    The names dictionary of load_data: lower-cased names mapped to the
+    set of person ids with that name, found by binary search over
+    order, the person positions sorted by lower-cased name. Sets are
+    kept once looked up, so people added later can join them.
+    """
+
+    def __init__(self, names, person_ids, order):
+        self.names = names
+        self.person_ids = person_ids
+        self.order = order
+        self.sets = {}
+
+    def key(self, person):
+        return self.names[person].lower()
+
+    def stored(self, key):
+        """
+        Returns the set of stored person ids named key.
+        """
+        order = self.order
+        i = bisect_left(order, key, key=self.key)
+        ids = set()
+        while i < len(order) and self.key(order[i]) == key:
+            ids.add(self.person_ids[order[i]])
+            i += 1
+        return ids
+
+    def __getitem__(self, key):
+        ids = self.sets.get(key)
+        if ids is None:
+            ids = self.stored(key)
+            if not ids:
+                raise KeyError(key)
+            self.sets[key] = ids
+        return ids
+
+    def __setitem__(self, key, ids):
+        self.sets[key] = ids
+
+    def __delitem__(self, key):
+        raise TypeError("names cannot be removed")
+
+    def __iter__(self):
+        previous = None
+        for person in self.order:
+            key = self.key(person)
+            if key != previous:
+                yield key
+                previous = key
+        for key in self.sets:
+            if not self.stored(key):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+
+class TreeCache():
+    """
+    Least-recently-used cache of full BFS trees keyed by source. A
+    query from a cached source is answered by walking parents back
+    from the target. Memory is bounded by max_bytes across all trees.
+    """
+
+    def __init__(self, graph, max_bytes=256 * 1024 * 1024):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def tree(self, source):
+        """
+        Returns the BFS tree of source, building it on a miss.
+        """
+        if source in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(source)
+            return self.trees[source]
+
+        self.misses += 1
+        tree = self.graph.bfs_tree(source)
+        size = sum(parents.itemsize * len(parents) for parents in tree)
+        if size > self.max_bytes:
+            return tree
+
+        while self.bytes + size > self.max_bytes:
+            self.evict()
+        self.trees[source] = tree
+        self.bytes += size
+        return tree
+
+    def evict(self):
+        """
+        Drops the least recently used tree.
+        """
+        _, tree = self.trees.popitem(last=False)
+        self.bytes -= sum(parents.itemsize * len(parents) for parents in tree)
+        self.evictions += 1
+
+    def invalidate(self, people):
+        """
+        Drops every tree that reaches any of the given people, since a
+        change to their movies may change paths within that tree.
+        """
+        for source in list(self.trees):
+            parent_person = self.trees[source][0]
+            if any(person < len(parent_person) and parent_person[person] != -1
+                   for person in people):
+                self.bytes -= sum(parents.itemsize * len(parents)
+                                  for parents in self.trees.pop(source))
+
+    def clear(self):
+        self.trees.clear()
+        self.bytes = 0
+
+    def path(self, source, target):
+        """
+        Returns a list of (movie, person) integer id pairs from source
+        to target, or None if the two people are not connected.
+        """
+        parent_person, parent_movie = self.tree(source)
+        if parent_person[target] == -1:
+            return None
+
+        path = []
+        person = target
+        while person != source:
+            path.append((parent_movie[person], person))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
+    def stats(self):
+        """
+        Returns hit/miss counters and current size, for sizing the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "trees": len(self.trees),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes
+        }
@@ -1,3 +1,8 @@
+import heapq
+import itertools
+from collections import deque
+
+
 class Node():
     def __init__(self, state, movie, parent):
         self.state = state
@@ -7,24 +12,30 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Maps each state in the frontier to its node
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = node
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def discard(self, node):
+        if self.states.get(node.state) is node:
+            del self.states[node.state]
+        return node
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            return self.discard(self.frontier.pop())
 
 
 class QueueFrontier(StackFrontier):
@@ -33,6 +44,27 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            return self.discard(self.frontier.popleft())
+
+
+class PriorityFrontier(StackFrontier):
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        # Adding a state again replaces the earlier node, which is then
+        # skipped when it reaches the top of the heap
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = node
+
+    def empty(self):
+        return len(self.states) == 0
+
+    def remove(self):
+        while self.frontier:
+            node = heapq.heappop(self.frontier)[2]
+            if self.states.get(node.state) is node:
+                return self.discard(node)
+        raise Exception("empty frontier")
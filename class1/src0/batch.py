@@ -0,0 +1,67 @@
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from maze import Maze, CompactMaze
+
+
+def main():
+    flags = ["--compact", "--fill-dead-ends"]
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    if len(args) not in [1, 2, 3]:
+        sys.exit("Usage: python batch.py directory|glob [algorithm] [processes] "
+                 "[--compact] [--fill-dead-ends]")
+    algorithm = args[1] if len(args) >= 2 else "astar"
+    processes = int(args[2]) if len(args) == 3 else None
+    if algorithm not in ["dfs", "bfs", "greedy", "astar", "jps"]:
+        sys.exit(f"Unknown algorithm: {algorithm}")
+
+    pattern = args[0]
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.txt")
+    filenames = sorted(glob.glob(pattern))
+
+    jobs = [
+        (filename, algorithm, "--compact" in sys.argv, "--fill-dead-ends" in sys.argv)
+        for filename in filenames
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap(solve, jobs):
+            print(json.dumps(result), flush=True)
+
+
+def solve(job):
+    """
+    Loads and solves one maze, returning its results as a
+    JSON-serializable dictionary.
+    """
+    filename, algorithm, compact, fill = job
+    result = {"maze": filename, "algorithm": algorithm}
+    try:
+        m = CompactMaze(filename) if compact else Maze(filename)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    start = time.perf_counter()
+    if fill:
+        result["pruned"] = m.fill_dead_ends()
+    try:
+        m.solve(algorithm)
+        result["solved"] = True
+        result["path_length"] = len(m.solution[0])
+    except Exception:
+        result["solved"] = False
+        result["path_length"] = None
+    result["seconds"] = time.perf_counter() - start
+    result["explored"] = m.num_explored
+    if algorithm == "jps":
+        result["scanned"] = m.num_scanned
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
+import heapq
+import itertools
+import struct
 import sys
+from array import array
+from collections import deque
 
 class Node():
     def __init__(self, state, parent, action):
@@ -9,25 +14,30 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Maps each state in the frontier to its node
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = node
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
-    # Optional. A value to return if the specified key does not exist. Default value None
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def discard(self, node):
+        if self.states.get(node.state) is node:
+            del self.states[node.state]
+        return node
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            return self.discard(self.frontier.pop())
 
 
 class QueueFrontier(StackFrontier):
@@ -36,12 +46,43 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            return self.discard(self.frontier.popleft())
+
+
+class PriorityFrontier(StackFrontier):
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        # Adding a state again replaces the earlier node, which is then
+        # skipped when it reaches the top of the heap
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = node
+
+    def empty(self):
+        return len(self.states) == 0
+
+    def remove(self):
+        while self.frontier:
+            node = heapq.heappop(self.frontier)[2]
+            if self.states.get(node.state) is node:
+                return self.discard(node)
+        raise Exception("empty frontier")
+
 
 class Maze():
 
+    # Row and column offsets of each action
+    DIRECTIONS = {
+        "up": (-1, 0),
+        "down": (1, 0),
+        "left": (0, -1),
+        "right": (0, 1)
+    }
+
+
     def __init__(self, filename):
 
         # Read file and set height and width of maze
@@ -117,17 +158,38 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def heuristic(self, state):
+        """Manhattan distance from state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def solve(self, algorithm="dfs"):
+        """
+        Finds a solution to maze, if one exists, using depth-first
+        ("dfs"), breadth-first ("bfs"), greedy best-first ("greedy"),
+        A* ("astar") or jump point ("jps") search.
+        """
+        if algorithm == "jps":
+            return self.solve_jps()
+        elif algorithm == "dfs":
+            frontier = StackFrontier()
+        elif algorithm == "bfs":
+            frontier = QueueFrontier()
+        elif algorithm in ["greedy", "astar"]:
+            frontier = PriorityFrontier()
+        else:
+            raise ValueError(f"unknown algorithm: {algorithm}")
 
         # Keep track of number of states explored
         self.num_explored = 0
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
         frontier.add(start)
 
+        # Cost of the best known path to each state
+        cost = {self.start: 0}
+
         # Initialize an empty explored set
         self.explored = set()
 
@@ -158,13 +220,231 @@ class Maze():
             # Mark node as explored
             self.explored.add(node.state)
 
-            # Add neighbors to frontier
+            # Add neighbors to frontier; A* also replaces a frontier
+            # node when it finds a cheaper path to the same state
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
+                if state in self.explored:
+                    continue
+                g = cost[node.state] + 1
+                if frontier.contains_state(state) and (algorithm != "astar" or cost[state] <= g):
+                    continue
+                cost[state] = g
+                child = Node(state=state, parent=node, action=action)
+                if algorithm == "astar":
+                    # Break ties between equal f towards the goal
+                    h = self.heuristic(state)
+                    frontier.add(child, (g + h, h))
+                elif algorithm == "greedy":
+                    frontier.add(child, self.heuristic(state))
+                else:
                     frontier.add(child)
 
 
+    def solve_jps(self):
+        """
+        Finds a shortest solution with Jump Point Search, an A* variant
+        that only adds jump points to the frontier: cells where a
+        shortest path may need to turn. Straight runs between them are
+        scanned without being added to the frontier.
+
+        Paths are kept canonical by preferring vertical moves before
+        horizontal ones. A horizontal scan stops where a wall behind it
+        ends above or below, the "forced neighbor" that a vertical-first
+        path could not have reached. A vertical scan stops at any row
+        from which a horizontal scan finds a jump point. num_explored
+        counts expanded jump points and num_scanned counts cells
+        visited by the scans.
+        """
+        self.num_explored = 0
+        self.num_scanned = 0
+
+        start = Node(state=self.start, parent=None, action=None)
+        frontier = PriorityFrontier()
+        frontier.add(start, (self.heuristic(self.start), 0))
+        cost = {self.start: 0}
+        self.explored = set()
+
+        while not frontier.empty():
+            node = frontier.remove()
+            self.num_explored += 1
+
+            # Expand the straight runs between jump points into a solution
+            if node.state == self.goal:
+                actions = []
+                cells = []
+                while node.parent is not None:
+                    row, col = node.state
+                    dr, dc = self.DIRECTIONS[node.action]
+                    while (row, col) != node.parent.state:
+                        actions.append(node.action)
+                        cells.append((row, col))
+                        row, col = row - dr, col - dc
+                    node = node.parent
+                actions.reverse()
+                cells.reverse()
+                self.solution = (actions, cells)
+                return
+
+            self.explored.add(node.state)
+
+            # Jump in every direction except back the way we came
+            for action, (dr, dc) in self.DIRECTIONS.items():
+                if node.action is not None:
+                    pr, pc = self.DIRECTIONS[node.action]
+                    if (dr, dc) == (-pr, -pc):
+                        continue
+                point = self.jump(node.state, dr, dc)
+                if point is None or point in self.explored:
+                    continue
+                g = cost[node.state] + abs(point[0] - node.state[0]) + abs(point[1] - node.state[1])
+                if point in cost and cost[point] <= g:
+                    continue
+                cost[point] = g
+                h = self.heuristic(point)
+                frontier.add(Node(state=point, parent=node, action=action), (g + h, h))
+
+        raise Exception("no solution")
+
+
+    def free(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row][col]
+
+
+    def jump(self, state, dr, dc):
+        """
+        Scans from state in direction (dr, dc) and returns the next
+        jump point, or None if the scan runs into a wall.
+        """
+        row, col = state
+        while True:
+            row, col = row + dr, col + dc
+            if not self.free(row, col):
+                return None
+            self.num_scanned += 1
+            if (row, col) == self.goal:
+                return (row, col)
+
+            # Horizontal: stop where a wall behind us ends above or below
+            if dr == 0:
+                for v in [-1, 1]:
+                    if self.free(row + v, col) and not self.free(row + v, col - dc):
+                        return (row, col)
+
+            # Vertical: stop where either horizontal scan finds a jump point
+            elif (self.jump((row, col), 0, -1) is not None
+                    or self.jump((row, col), 0, 1) is not None):
+                return (row, col)
+
+
+    def fill_dead_ends(self):
+        """
+        Turns dead ends into walls: repeatedly fills every open cell
+        other than the start and goal that has at most one open
+        neighbor. No solution passes through such a cell, so any
+        solver can then run on the reduced grid. Returns the number of
+        cells filled, also kept in self.num_pruned.
+        """
+        width = self.width
+        ends = [self.start, self.goal]
+
+        # Number of open neighbors of each cell, by row * width + col
+        degree = bytearray(self.height * width)
+        worklist = []
+        for row in range(self.height):
+            for col in range(width):
+                if not self.walls[row][col]:
+                    degree[row * width + col] = len(self.neighbors((row, col)))
+                    if degree[row * width + col] <= 1 and (row, col) not in ends:
+                        worklist.append((row, col))
+
+        self.num_pruned = 0
+        while worklist:
+            row, col = worklist.pop()
+            if self.walls[row][col]:
+                continue
+            neighbors = self.neighbors((row, col))
+            self.walls[row][col] = True
+            self.num_pruned += 1
+            for _, (r, c) in neighbors:
+                degree[r * width + c] -= 1
+                if degree[r * width + c] == 1 and (r, c) not in ends:
+                    worklist.append((r, c))
+        return self.num_pruned
+
+
+    def distance_field(self):
+        """
+        Runs one breadth-first search backwards from the goal. Stores in
+        self.field the distance from every cell to the goal (-1 if the
+        goal cannot be reached) and the action to take from each cell,
+        as flat arrays indexed by row * width + col.
+        """
+        distances = array("i", [-1]) * (self.height * self.width)
+
+        # steps holds 1 + the index in actions of the move towards the goal
+        steps = bytearray(self.height * self.width)
+        goal = self.goal[0] * self.width + self.goal[1]
+        distances[goal] = 0
+        queue = deque([self.goal])
+        while queue:
+            row, col = queue.popleft()
+            distance = distances[row * self.width + col]
+            for i, (dr, dc) in enumerate(self.DIRECTIONS.values()):
+                r, c = row - dr, col - dc
+                if self.free(r, c) and distances[r * self.width + c] == -1:
+                    distances[r * self.width + c] = distance + 1
+                    steps[r * self.width + c] = i + 1
+                    queue.append((r, c))
+        self.field = (distances, steps)
+
+
+    def solve_from(self, start):
+        """
+        Returns the (actions, cells) solution from start to the goal by
+        following the distance field, without searching.
+        """
+        distances, steps = self.field
+        row, col = start
+        if self.walls[row][col] or distances[row * self.width + col] == -1:
+            raise Exception("no solution")
+
+        actions = list(self.DIRECTIONS)
+        path_actions = []
+        cells = []
+        while (row, col) != self.goal:
+            action = actions[steps[row * self.width + col] - 1]
+            dr, dc = self.DIRECTIONS[action]
+            row, col = row + dr, col + dc
+            path_actions.append(action)
+            cells.append((row, col))
+        return (path_actions, cells)
+
+
+    def save_field(self, filename):
+        """
+        Writes the distance field to filename.
+        """
+        distances, steps = self.field
+        with open(filename, "wb") as f:
+            f.write(struct.pack("<3i", self.height, self.width, distances.itemsize))
+            distances.tofile(f)
+            f.write(steps)
+
+
+    def load_field(self, filename):
+        """
+        Reads a distance field written by save_field for this maze.
+        """
+        with open(filename, "rb") as f:
+            height, width, itemsize = struct.unpack("<3i", f.read(12))
+            if (height, width) != (self.height, self.width) or itemsize != array("i").itemsize:
+                raise ValueError("distance field does not match this maze")
+            distances = array("i")
+            distances.fromfile(f, height * width)
+            steps = bytearray(f.read(height * width))
+        self.field = (distances, steps)
+
+
     def output_image(self, filename, show_solution=True, show_explored=False):
         from PIL import Image, ImageDraw
         cell_size = 50
@@ -216,15 +496,245 @@ class Maze():
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+    def output_image_array(self, filename, show_solution=True, show_explored=False,
+                           cell_size=50, cell_border=2):
+        """
+        Same picture as output_image, built as an H x W array of cell
+        colors with a few NumPy assignments, scaled up once with
+        nearest-neighbor resampling and saved in one write.
+        """
+        import numpy as np
+        from PIL import Image
+
+        colors = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        colors[:] = (237, 240, 252)
+
+        # Paint from the lowest to the highest priority, as in output_image
+        if self.solution is not None:
+            if show_explored:
+                colors[self.cell_mask(self.explored)] = (212, 97, 85)
+            if show_solution:
+                colors[self.cell_mask(self.solution[1])] = (220, 235, 113)
+        colors[self.goal] = (0, 171, 28)
+        colors[self.start] = (255, 0, 0)
+        colors[self.wall_mask()] = (40, 40, 40)
+
+        img = Image.fromarray(colors, "RGB").resize(
+            (self.width * cell_size, self.height * cell_size), Image.NEAREST
+        )
+
+        # Black out the border around every cell
+        pixels = np.array(img)
+        inside = np.zeros(cell_size, dtype=bool)
+        inside[cell_border:cell_size - cell_border + 1] = True
+        pixels[~np.tile(inside, self.height)] = 0
+        pixels[:, ~np.tile(inside, self.width)] = 0
+        Image.fromarray(pixels, "RGB").save(filename)
+
+
+    def wall_mask(self):
+        import numpy as np
+        return np.array(self.walls, dtype=bool)
+
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
\ No newline at end of file
+    def cell_mask(self, cells):
+        """
+        Returns an H x W boolean array marking the given (row, col) cells.
+        """
+        import numpy as np
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        cells = list(cells)
+        if cells:
+            rows, cols = zip(*cells)
+            mask[list(rows), list(cols)] = True
+        return mask
+
+
+class CompactMaze(Maze):
+    """
+    Maze for very large grids. Walls live in one flat bytearray and the
+    solver works on flat cell indices (row * width + col) with
+    precomputed neighbor offsets. walls is a list of memoryview rows
+    over that bytearray, so print, neighbors and output_image work
+    unchanged.
+    """
+
+    # Maps the space, start and goal characters to 0 and all others to 1
+    CELLS = bytes(0 if chr(b) in " AB" else 1 for b in range(256))
+
+    MOVES = ["up", "down", "left", "right"]
+
+    def __init__(self, filename):
+
+        # Read file and set height and width of maze
+        with open(filename) as f:
+            contents = f.read()
+
+        # Validate start and goal
+        if contents.count("A") != 1:
+            raise Exception("maze must have exactly one start point")
+        if contents.count("B") != 1:
+            raise Exception("maze must have exactly one goal")
+
+        # Determine height and width of maze
+        contents = contents.splitlines()
+        self.height = len(contents)
+        self.width = max(len(line) for line in contents)
+
+        # Keep track of walls, one byte per cell
+        self.grid = bytearray(self.height * self.width)
+        for i, line in enumerate(contents):
+            row = line.encode("latin-1", "replace").translate(self.CELLS)
+            self.grid[i * self.width:i * self.width + len(row)] = row
+            if "A" in line:
+                self.start = (i, line.index("A"))
+            if "B" in line:
+                self.goal = (i, line.index("B"))
+
+        view = memoryview(self.grid)
+        self.walls = [view[i * self.width:(i + 1) * self.width] for i in range(self.height)]
+        self.solution = None
+
+
+    def index(self, state):
+        return state[0] * self.width + state[1]
+
+
+    def wall_mask(self):
+        import numpy as np
+        return np.frombuffer(self.grid, dtype=np.uint8).reshape(self.height, self.width) != 0
+
+
+    def cell_mask(self, cells):
+        import numpy as np
+        if isinstance(cells, CellSet):
+            return np.frombuffer(cells.cells, dtype=np.uint8).reshape(self.height, self.width) != 0
+        return super().cell_mask(cells)
+
+
+    def solve(self, algorithm="dfs"):
+        """
+        Finds a solution to maze, if one exists, with the same
+        algorithms as Maze.solve, over flat cell indices.
+        """
+        if algorithm == "jps":
+            return self.solve_jps()
+        if algorithm not in ["dfs", "bfs", "greedy", "astar"]:
+            raise ValueError(f"unknown algorithm: {algorithm}")
+
+        width = self.width
+        grid = self.grid
+        size = len(grid)
+        offsets = (-width, width, -1, 1)
+        start = self.index(self.start)
+        goal = self.index(self.goal)
+        goal_row, goal_col = self.goal
+
+        # came_from holds 1 + the move that first reached each cell,
+        # or 0 if the cell has not been reached
+        came_from = bytearray(size)
+        explored = bytearray(size)
+        came_from[start] = 1
+        cost = {start: 0}
+        self.num_explored = 0
+
+        informed = algorithm in ["greedy", "astar"]
+        if informed:
+            frontier = [((0, 0), start)]
+        else:
+            frontier = deque([start])
+            pop = frontier.pop if algorithm == "dfs" else frontier.popleft
+
+        while frontier:
+            if informed:
+                cell = heapq.heappop(frontier)[1]
+                if explored[cell]:
+                    continue
+            else:
+                cell = pop()
+            self.num_explored += 1
+
+            if cell == goal:
+                actions = []
+                cells = []
+                while cell != start:
+                    move = came_from[cell] - 1
+                    actions.append(self.MOVES[move])
+                    cells.append(divmod(cell, width))
+                    cell -= offsets[move]
+                actions.reverse()
+                cells.reverse()
+                self.solution = (actions, cells)
+                self.explored = CellSet(explored, width)
+                return
+
+            explored[cell] = 1
+            row, col = divmod(cell, width)
+            for move in range(4):
+                if (move == 0 and row == 0 or move == 1 and cell + width >= size
+                        or move == 2 and col == 0 or move == 3 and col == width - 1):
+                    continue
+                neighbor = cell + offsets[move]
+                if grid[neighbor] or explored[neighbor]:
+                    continue
+                g = cost[cell] + 1 if informed else 0
+                if came_from[neighbor] and (algorithm != "astar" or cost[neighbor] <= g):
+                    continue
+                came_from[neighbor] = move + 1
+                if informed:
+                    cost[neighbor] = g
+                    n_row, n_col = divmod(neighbor, width)
+                    h = abs(n_row - goal_row) + abs(n_col - goal_col)
+                    priority = (g + h, h) if algorithm == "astar" else (h, 0)
+                    heapq.heappush(frontier, (priority, neighbor))
+                else:
+                    frontier.append(neighbor)
+
+        self.explored = CellSet(explored, width)
+        raise Exception("no solution")
+
+
+class CellSet():
+    """
+    Read-only set of (row, col) cells backed by a flat bytearray.
+    """
+
+    def __init__(self, cells, width):
+        self.cells = cells
+        self.width = width
+
+    def __contains__(self, state):
+        return bool(self.cells[state[0] * self.width + state[1]])
+
+    def __len__(self):
+        return len(self.cells) - self.cells.count(0)
+
+
+def main():
+    flags = ["--compact", "--fill-dead-ends"]
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    if len(args) not in [1, 2]:
+        sys.exit("Usage: python maze.py maze.txt [dfs|bfs|greedy|astar|jps] "
+                 "[--compact] [--fill-dead-ends]")
+    algorithm = args[1] if len(args) == 2 else "dfs"
+
+    if "--compact" in sys.argv:
+        m = CompactMaze(args[0])
+    else:
+        m = Maze(args[0])
+    print("Maze:")
+    m.print()
+    if "--fill-dead-ends" in sys.argv:
+        print("Dead-end cells filled:", m.fill_dead_ends())
+    print(f"Solving with {algorithm}...")
+    m.solve(algorithm)
+    print("States Explored:", m.num_explored)
+    if algorithm == "jps":
+        print("Cells Scanned:", m.num_scanned)
+    print("Solution:")
+    m.print()
+    m.output_image_array("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,24 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Bitboards: X and O are each a 9-bit integer where bit 3 * i + j is set
+# if they hold cell (i, j). The list-of-lists functions below are thin
+# adapters over these.
+FULL = 0b111111111
+
+# Masks of the three cells of each row, column and diagonal
+WINS = [0b000000111, 0b000111000, 0b111000000,
+        0b001001001, 0b010010010, 0b100100100,
+        0b100010001, 0b001010100]
+
+# Search order: center, corners, then edges, so cutoffs come early
+ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
 
 def initial_state():
     """
@@ -19,89 +31,92 @@ def initial_state():
             [EMPTY, EMPTY, EMPTY]]
 
 
+def encode(board):
+    """
+    Returns the (x, o) bitboards of a board.
+    """
+    x = 0
+    o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """
+    Returns the board for the (x, o) bitboards.
+    """
+    board = initial_state()
+    for i in range(3):
+        for j in range(3):
+            if x >> (3 * i + j) & 1:
+                board[i][j] = X
+            elif o >> (3 * i + j) & 1:
+                board[i][j] = O
+    return board
+
+
+def bits_player(x, o):
+    return O if bin(x).count("1") > bin(o).count("1") else X
+
+
+def bits_winner(x, o):
+    for mask in WINS:
+        if x & mask == mask:
+            return X
+        if o & mask == mask:
+            return O
+    return None
+
+
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    xcount = 0
-    ocount = 0
-    # ecount = 0
-    for i in board:
-        for j in i:
-            if j == "X":
-                xcount +=1
-            elif j == "O":
-                ocount +=1
-            # else:
-                # ecount +=1
-    if xcount >ocount:
-        return "O"
-    else:
-        return "X"
+    return bits_player(*encode(board))
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    act=set()
-    for i in range(len(board)):
-        for j in range(len(board)):
-            if board[i][j] == EMPTY:
-                act.add((i,j))
-    return act
+    x, o = encode(board)
+    return {(i // 3, i % 3) for i in range(9) if not (x | o) >> i & 1}
+
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    newboard = copy.deepcopy(board)
-    turn = player(board)
-    i = action[0]
-    j = action[1]
-    if i >3 or j>3:
-        raise ValueError("Invaid move")
-    if newboard[i][j] == EMPTY:
-        newboard[i][j] = turn
-    else:
+    x, o = encode(board)
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise ValueError("Invalid move")
+    bit = 1 << (3 * i + j)
+    if (x | o) & bit:
         raise ValueError("Not empty!")
-    return newboard
+    if bits_player(x, o) == X:
+        return decode(x | bit, o)
+    return decode(x, o | bit)
+
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(len(board)):
-        for j in range(len(board)):
-            if board[i][j] != EMPTY:
-                if 0<j<2:
-                    if board[i][j-1] == board[i][j] and board[i][j]==board[i][j+1]:
-                        return board[i][j]
-                if 0<i<2:
-                    if board[i][j] == board[i-1][j] and board[i][j] == board[i+1][j]:
-                        return board[i][j]
-                if 0<i<2 and 0<j<2:
-                    if (board[i][j] == board[i-1][j-1] and board[i][j] == board[i+1][j+1]) or (board[i][j] == board[i-1][j+1] and board[i][j] == board[i+1][j-1]):
-                        return board[i][j]
-    return None
+    return bits_winner(*encode(board))
+
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    win = winner(board)
-    count =0
-    if win != None:
-        return True
-    for i in board:
-        for j in i:
-             if j == EMPTY:
-                 count +=1
-    if count ==0:
-        return True
-    else:
-        return False
-    
+    x, o = encode(board)
+    return bits_winner(x, o) is not None or x | o == FULL
 
 
 def utility(board):
@@ -109,74 +124,132 @@ def utility(board):
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
     win = winner(board)
-    if win == "X":
+    if win == X:
         return 1
-    elif win =="O":
+    elif win == O:
         return -1
     else:
         return 0
 
-def max_min(board):
-    if terminal(board):
-        return False
-    score = -9999
-    acts = actions(board)
-    for act in acts:
-        newboard = result(board, act)
-        if not terminal(newboard):
-            play = player(newboard)
-            if play == "O":
-                tmp = min_max(newboard)
-            else:
-                tmp = max_min(newboard)
-        else:
-            tmp = utility(newboard) 
-        if tmp > score:
-            score = tmp
-    return score
 
-def min_max(board):
-    if terminal(board):
-        return False
-    score = 9999
-    acts = actions(board)
-    for act in acts:
-        newboard = result(board, act)
-        if not terminal(newboard):
-            play = player(newboard)
-            if play == "O":
-                tmp = min_max(newboard)
-            else:
-                tmp = max_min(newboard)
-        else:
-            tmp = utility(newboard) 
-        if tmp < score:
-            score = tmp
+# Maps x | o << 9 to its searched value and whether that value is
+# exact or only a lower or upper bound
+EXACT, LOWER, UPPER = 0, 1, 2
+transposition = {}
+
+
+def evaluate(x, o):
+    """
+    Returns the utility of the (x, o) bitboards if the game is over
+    there, otherwise None.
+    """
+    for mask in WINS:
+        if x & mask == mask:
+            return 1
+        if o & mask == mask:
+            return -1
+    if x | o == FULL:
+        return 0
+    return None
+
+
+def lookup(key, alpha, beta):
+    """
+    Returns a stored value for key that is usable within the
+    (alpha, beta) window, or None.
+    """
+    entry = transposition.get(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+            return value
+    return None
+
+
+def store(key, value, alpha, beta):
+    if value <= alpha:
+        transposition[key] = (value, UPPER)
+    elif value >= beta:
+        transposition[key] = (value, LOWER)
+    else:
+        transposition[key] = (value, EXACT)
+
+
+def max_min(x, o, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the value of the (x, o) bitboards with X to move, searched
+    with alpha-beta pruning.
+    """
+    score = evaluate(x, o)
+    if score is not None:
+        return score
+    key = x | o << 9
+    score = lookup(key, alpha, beta)
+    if score is not None:
+        return score
+
+    original_alpha = alpha
+    score = -math.inf
+    for i in ORDER:
+        bit = 1 << i
+        if not (x | o) & bit:
+            score = max(score, min_max(x | bit, o, alpha, beta))
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+    store(key, score, original_alpha, beta)
     return score
 
 
+def min_max(x, o, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the value of the (x, o) bitboards with O to move, searched
+    with alpha-beta pruning.
+    """
+    score = evaluate(x, o)
+    if score is not None:
+        return score
+    key = x | o << 9
+    score = lookup(key, alpha, beta)
+    if score is not None:
+        return score
+
+    original_beta = beta
+    score = math.inf
+    for i in ORDER:
+        bit = 1 << i
+        if not (x | o) & bit:
+            score = min(score, max_min(x, o | bit, alpha, beta))
+            beta = min(beta, score)
+            if alpha >= beta:
+                break
+    store(key, score, alpha, original_beta)
+    return score
+
 
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
     optimal = (0,0)
-    acts = actions(board)
-    play = player(board)
+    x, o = encode(board)
+    play = bits_player(x, o)
     if play == "O":
-        tmp = 9999
-        for act in acts:
-            newboard = result(board, act)
-            score = max_min(newboard)
-            if score <tmp:
-                tmp = score
-                optimal = act
+        tmp = math.inf
+        for i in ORDER:
+            bit = 1 << i
+            if not (x | o) & bit:
+                score = max_min(x, o | bit, -math.inf, tmp)
+                if score < tmp:
+                    tmp = score
+                    optimal = (i // 3, i % 3)
     else:
-        tmp = -9999
-        for act in acts:
-            newboard = result(board, act)
-            score = min_max(newboard)
-            if score >tmp:
-                tmp = score
-                optimal = act
-    return optimal
\ No newline at end of file
+        tmp = -math.inf
+        for i in ORDER:
+            bit = 1 << i
+            if not (x | o) & bit:
+                score = min_max(x | bit, o, tmp, math.inf)
+                if score > tmp:
+                    tmp = score
+                    optimal = (i // 3, i % 3)
+    return optimal